@@ -1,8 +1,15 @@
 import streamlit as st
 import pandas as pd
-import pyproj
+import numpy as np
 import io
-import google.generativeai as genai
+import re
+
+# pyarrow (dependensi bawaan Streamlit) dipakai untuk membaca CSV lebih cepat bila tersedia
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = pa_csv = None
 
 # Konfigurasi halaman Streamlit
 st.set_page_config(page_title="Konverter Koordinat Spasial", layout="wide")
@@ -26,60 +33,180 @@ coordinate_systems = {
     }
 }
 
+# Daftar pilihan sidebar disiapkan sekali dan dipakai ulang oleh semua selectbox
+_CATEGORIES = tuple(coordinate_systems.keys())
+_NAMES_BY_CAT = {category: tuple(systems.keys()) for category, systems in coordinate_systems.items()}
+
+# Jumlah baris CSV yang diproses per potongan dan yang ditampilkan sebagai pratinjau
+CSV_CHUNK_SIZE = 100_000
+CSV_BLOCK_SIZE = 16 * 1024 * 1024  # ukuran blok (byte) untuk pembaca CSV pyarrow
+PREVIEW_ROWS = 1000
+FAILED_ROW_EXAMPLES = 10  # jumlah indeks baris gagal yang ditampilkan di peringatan
+
+# Fungsi untuk membaca CSV per potongan; kolom x dan y dibaca sebagai float64, kolom lain apa adanya
+def _iter_csv_chunks(csv_file, columns):
+    if pa_csv is None:
+        yield from pd.read_csv(csv_file, chunksize=CSV_CHUNK_SIZE, dtype={'x': 'float64', 'y': 'float64'})
+        return
+    column_types = {name: pa.string() for name in columns}
+    column_types.update({'x': pa.float64(), 'y': pa.float64()})
+    reader = pa_csv.open_csv(
+        csv_file,
+        read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+        convert_options=pa_csv.ConvertOptions(column_types=column_types),
+    )
+    for batch in reader:
+        yield batch.to_pandas()
+
+# Transformer disimpan di cache agar tidak dibuat ulang di setiap konversi maupun rerun Streamlit
+@st.cache_resource(show_spinner=False)
+def _get_transformer(source_crs, target_crs):
+    import pyproj
+    return pyproj.Transformer.from_crs(source_crs, target_crs, always_xy=True)
+
 # Fungsi untuk konversi koordinat
 def convert_coordinates(x_coord, y_coord, source_crs, target_crs):
+    import pyproj
+    # CRS sumber dan target sama: tidak perlu memanggil PROJ
+    if source_crs == target_crs:
+        return x_coord, y_coord
     try:
-        transformer = pyproj.Transformer.from_crs(source_crs, target_crs, always_xy=True)
-        return transformer.transform(x_coord, y_coord)
+        return _get_transformer(source_crs, target_crs).transform(x_coord, y_coord)
     except pyproj.exceptions.CRSError as e:
         st.error(f"Terjadi kesalahan pada sistem koordinat: {e}")
         return None, None
 
+# Tabel nama sistem koordinat (huruf kecil) ke kode EPSG, dibangun sekali saat modul dimuat
+_NAME_TO_EPSG = {
+    name.lower(): crs_code
+    for category in coordinate_systems.values()
+    for name, crs_code in category.items()
+}
+# Nama terpanjang dicoba lebih dulu agar nama UTM tidak tertangkap sebagai "wgs 84" saja
+_NAME_RE = re.compile("|".join(re.escape(name) for name in sorted(_NAME_TO_EPSG, key=len, reverse=True)))
+
+# Fungsi untuk mencari kode EPSG dari nama sistem koordinat yang ditulis pengguna
+def _lookup_crs(name):
+    if name in _NAME_TO_EPSG:
+        return _NAME_TO_EPSG[name]
+    for known_name, crs_code in _NAME_TO_EPSG.items():
+        if name in known_name:
+            return crs_code
+    match = _NAME_RE.search(name)
+    return _NAME_TO_EPSG[match.group(0)] if match else None
+
+# Fungsi untuk memvalidasi pasangan CRS sekali sebelum konversi massal
+def validate_crs(source_crs, target_crs):
+    import pyproj
+    try:
+        return _get_transformer(source_crs, target_crs)
+    except pyproj.exceptions.CRSError as e:
+        st.error(f"Terjadi kesalahan pada sistem koordinat: {e}")
+        return None
+
+# Fungsi untuk konversi massal tanpa try/except per titik; titik gagal ditandai lewat mask
+def transform_bulk(xs, ys, transformer):
+    x_out, y_out = transformer.transform(xs, ys)
+    valid = np.isfinite(x_out) & np.isfinite(y_out)
+    # Baris gagal diisi NaN di kedua kolom agar hasilnya kosong di CSV, bukan inf
+    x_out[~valid] = np.nan
+    y_out[~valid] = np.nan
+    return x_out, y_out, valid
+
+# Hasil konversi CSV disimpan di cache berdasarkan isi file, sehingga rerun tidak mengulang konversi.
+# Mengembalikan (csv_hasil, pratinjau_asli, pratinjau_hasil, jumlah_baris_gagal, contoh_indeks_gagal).
+@st.cache_data(show_spinner=False, max_entries=8)
+def _convert_csv_bytes(raw_csv, source_crs, target_crs):
+    transformer = _get_transformer(source_crs, target_crs)
+    columns = pd.read_csv(io.BytesIO(raw_csv), nrows=0).columns
+    # File dibaca dan dikonversi per potongan agar memori tidak memuat seluruh file sekaligus
+    csv_buffer = io.BytesIO()
+    preview_original = preview_converted = None
+    failed_rows = 0
+    failed_examples = []
+    row_offset = 0
+    for i, chunk in enumerate(_iter_csv_chunks(io.BytesIO(raw_csv), columns)):
+        if i == 0:
+            # Kolom hasil ditambahkan langsung ke potongan; pratinjau ini tidak ikut berubah
+            preview_original = chunk.head(PREVIEW_ROWS)
+        # Seluruh kolom dikonversi dalam satu panggilan PROJ, bukan per baris
+        xs = chunk['x'].to_numpy(dtype='float64')
+        ys = chunk['y'].to_numpy(dtype='float64')
+        x_out, y_out, valid = transform_bulk(xs, ys, transformer)
+        chunk['x_converted'], chunk['y_converted'] = x_out, y_out
+        if not valid.all():
+            failed_index = np.flatnonzero(~valid)
+            failed_rows += len(failed_index)
+            failed_examples.extend((failed_index[:FAILED_ROW_EXAMPLES] + row_offset).tolist())
+            del failed_examples[FAILED_ROW_EXAMPLES:]
+        row_offset += len(chunk)
+        if i == 0:
+            preview_converted = chunk.head(PREVIEW_ROWS)
+        chunk.to_csv(csv_buffer, header=(i == 0), index=False, mode='ab')
+    if preview_original is None:
+        # CSV tanpa baris data: pyarrow tidak menghasilkan potongan apa pun, jadi header ditulis di sini
+        preview_original = pd.DataFrame(columns=columns)
+        preview_converted = pd.DataFrame(columns=[*columns, 'x_converted', 'y_converted'])
+        preview_converted.to_csv(csv_buffer, index=False, mode='ab')
+    return csv_buffer.getvalue(), preview_original, preview_converted, failed_rows, failed_examples
+
+# Pola 'x, y dari SOURCE ke TARGET' diurai dalam satu kali pencocokan regex
+_PROMPT_RE = re.compile(
+    r"(?P<x>[-+]?\d+(?:\.\d+)?)\s*[, ]\s*(?P<y>[-+]?\d+(?:\.\d+)?)"
+    r"\s+dari\s+(?P<src>.+?)\s+ke\s+(?P<dst>.+?)[\s.!?]*$",
+    re.IGNORECASE,
+)
+
 # Fungsi untuk memproses permintaan konversi dari teks
-def process_gemini_request(prompt, coordinate_systems):
+def process_gemini_request(prompt):
     # Logika sederhana untuk mengekstrak informasi dari prompt
     # Ini adalah bagian paling menantang yang membutuhkan prompt engineering
     # Untuk contoh ini, kita asumsikan formatnya 'x,y dari SOURCE ke TARGET'
-    try:
-        parts = prompt.lower().replace(",", " ").split(" ")
-        x_str = parts[0]
-        y_str = parts[1]
-        source_name_parts = parts[parts.index("dari") + 1 : parts.index("ke")]
-        target_name_parts = parts[parts.index("ke") + 1 :]
-        
-        source_name = " ".join(source_name_parts).strip()
-        target_name = " ".join(target_name_parts).strip()
-
-        # Mencocokkan nama dengan kamus yang ada
-        source_crs = None
-        for category in coordinate_systems.values():
-            for name, crs_code in category.items():
-                if source_name in name.lower():
-                    source_crs = crs_code
-                    break
-            if source_crs: break
-
-        target_crs = None
-        for category in coordinate_systems.values():
-            for name, crs_code in category.items():
-                if target_name in name.lower():
-                    target_crs = crs_code
-                    break
-            if target_crs: break
-
-        if not source_crs or not target_crs:
-            return "Maaf, saya tidak dapat menemukan sistem koordinat yang Anda maksud."
-
-        x_val = float(x_str)
-        y_val = float(y_str)
-        
-        x_conv, y_conv = convert_coordinates(x_val, y_val, source_crs, target_crs)
-        if x_conv is not None:
-            return f"Koordinat hasil konversi adalah: X = **{x_conv:.6f}**, Y = **{y_conv:.6f}**"
-        else:
-            return "Terjadi kesalahan saat konversi. Mohon periksa kembali input Anda."
-    except (ValueError, IndexError):
-        return "Format permintaan Anda salah. Mohon gunakan format: `x, y dari [sistem_sumber] ke [sistem_target]`"
+    # Mengembalikan (status, teks) dengan status 'ok', 'unmatched', 'bad_format', atau 'error'
+    match = _PROMPT_RE.search(prompt)
+    if match is None:
+        return "bad_format", "Format permintaan Anda salah. Mohon gunakan format: `x, y dari [sistem_sumber] ke [sistem_target]`"
+
+    source_name = " ".join(match.group("src").lower().split())
+    target_name = " ".join(match.group("dst").lower().split())
+
+    # Mencocokkan nama dengan kamus yang ada
+    source_crs = _lookup_crs(source_name)
+    target_crs = _lookup_crs(target_name)
+
+    if not source_crs or not target_crs:
+        return "unmatched", "Maaf, saya tidak dapat menemukan sistem koordinat yang Anda maksud."
+
+    x_val = float(match.group("x"))
+    y_val = float(match.group("y"))
+    
+    x_conv, y_conv = convert_coordinates(x_val, y_val, source_crs, target_crs)
+    if x_conv is not None:
+        return "ok", f"Koordinat hasil konversi adalah: X = **{x_conv:.6f}**, Y = **{y_conv:.6f}**"
+    else:
+        return "error", "Terjadi kesalahan saat konversi. Mohon periksa kembali input Anda."
+
+# Angka desimal pada prompt dibulatkan agar variasi penulisan yang setara memakai cache yang sama
+_DECIMAL_RE = re.compile(r"[-+]?\d+\.\d+")
+
+# Fungsi untuk menormalkan prompt sebelum dijadikan kunci cache
+def _normalize_prompt(prompt):
+    text = prompt.lower().replace(",", ", ")
+    text = _DECIMAL_RE.sub(lambda m: f"{float(m.group(0)):.6f}", text)
+    return " ".join(text.split()).replace(" ,", ",")
+
+# Model Gemini disiapkan saat pertama kali dibutuhkan lalu disimpan di cache antar-rerun
+@st.cache_resource(show_spinner=False)
+def _get_gemini_model(api_key):
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel('gemini-2.5-flash')
+
+# Jawaban Gemini disimpan di cache agar prompt yang sama tidak memanggil API berulang kali
+@st.cache_data(ttl=3600, show_spinner=False)
+def _gemini_answer(prompt_normalized, _api_key):
+    gemini_response = _get_gemini_model(_api_key).generate_content(f"Tolong bantu konversi koordinat spasial. Formatnya: 'x, y dari [sistem_sumber] ke [sistem_target]'. Berikut permintaan pengguna: {prompt_normalized}")
+    return gemini_response.text
 
 # --- Bagian 2: Antarmuka Streamlit (Tab) ---
 st.title("🗺️ Konverter Koordinat Spasial")
@@ -96,11 +223,11 @@ with tab1:
         
         source_category = st.selectbox(
             "Pilih Kategori Sumber:",
-            list(coordinate_systems.keys())
+            _CATEGORIES
         )
         source_cs_name = st.selectbox(
             "Pilih Sistem Koordinat Sumber:",
-            list(coordinate_systems[source_category].keys())
+            _NAMES_BY_CAT[source_category]
         )
         source_crs = coordinate_systems[source_category][source_cs_name]
         
@@ -108,11 +235,11 @@ with tab1:
         
         target_category = st.selectbox(
             "Pilih Kategori Target:",
-            list(coordinate_systems.keys())
+            _CATEGORIES
         )
         target_cs_name = st.selectbox(
             "Pilih Sistem Koordinat Target:",
-            list(coordinate_systems[target_category].keys())
+            _NAMES_BY_CAT[target_category]
         )
         target_crs = coordinate_systems[target_category][target_cs_name]
 
@@ -120,13 +247,16 @@ with tab1:
     input_tab1, input_tab2 = st.tabs(["Input Manual", "Unggah CSV"])
 
     with input_tab1:
-        col1, col2 = st.columns(2)
-        with col1:
-            x_input = st.text_input("Masukkan koordinat X:")
-        with col2:
-            y_input = st.text_input("Masukkan koordinat Y:")
+        # Input dibungkus form agar skrip hanya dijalankan ulang saat tombol Konversi ditekan
+        with st.form("manual_conv", clear_on_submit=False):
+            col1, col2 = st.columns(2)
+            with col1:
+                x_input = st.text_input("Masukkan koordinat X:")
+            with col2:
+                y_input = st.text_input("Masukkan koordinat Y:")
+            submitted = st.form_submit_button("Konversi")
         
-        if st.button("Konversi"):
+        if submitted:
             if x_input and y_input:
                 try:
                     x_val = float(x_input)
@@ -141,21 +271,26 @@ with tab1:
 
     with input_tab2:
         uploaded_file = st.file_uploader("Pilih file CSV", type="csv")
-        if uploaded_file is not None:
+        if uploaded_file is not None and validate_crs(source_crs, target_crs) is not None:
             try:
-                df = pd.read_csv(uploaded_file)
-                if 'x' in df.columns and 'y' in df.columns:
+                raw_csv = uploaded_file.getvalue()
+                columns = pd.read_csv(io.BytesIO(raw_csv), nrows=0).columns
+                if 'x' in columns and 'y' in columns:
                     st.success("File CSV berhasil diunggah.")
+                    csv_output, preview_original, preview_converted, failed_rows, failed_examples = _convert_csv_bytes(
+                        raw_csv, source_crs, target_crs
+                    )
+                    if failed_rows:
+                        more = " ..." if failed_rows > len(failed_examples) else ""
+                        st.warning(
+                            f"{failed_rows} baris gagal dikonversi (lihat indeks: {failed_examples}{more}). "
+                            "Mohon periksa kembali nilai koordinatnya."
+                        )
                     st.write("Data Asli:")
-                    st.dataframe(df)
-                    df_converted = df.copy()
-                    df_converted['x_converted'], df_converted['y_converted'] = zip(*df_converted.apply(
-                        lambda row: convert_coordinates(row['x'], row['y'], source_crs, target_crs),
-                        axis=1
-                    ))
+                    st.dataframe(preview_original)
                     st.write("Data Hasil Konversi:")
-                    st.dataframe(df_converted)
-                    csv_output = df_converted.to_csv(index=False).encode('utf-8')
+                    st.dataframe(preview_converted)
+                    st.caption(f"Pratinjau menampilkan maksimal {PREVIEW_ROWS} baris pertama.")
                     st.download_button(
                         label="📥 Unduh Hasil Konversi (CSV)",
                         data=csv_output,
@@ -164,6 +299,11 @@ with tab1:
                     )
                 else:
                     st.error("File CSV harus memiliki kolom **'x'** dan **'y'**.")
+            except (pd.errors.ParserError, pd.errors.EmptyDataError) as e:
+                st.error(f"Terjadi kesalahan saat membaca file: {e}")
+            except ValueError as e:
+                # Nilai x/y yang bukan angka gagal saat parsing (termasuk ArrowInvalid dari pyarrow)
+                st.error(f"Kolom **'x'** dan **'y'** harus berupa angka: {e}")
             except Exception as e:
                 st.error(f"Terjadi kesalahan saat membaca file: {e}")
 
@@ -174,12 +314,10 @@ with tab2:
     # Ambil API key dari Streamlit secrets
     try:
         genai_api_key = st.secrets["gemini_api_key"]
-        genai.configure(api_key=genai_api_key)
     except KeyError:
         st.error("API Key Gemini tidak ditemukan. Harap tambahkan `gemini_api_key` di Streamlit secrets.")
         st.stop()
 
-    model = genai.GenerativeModel('gemini-2.5-flash')
     if "messages" not in st.session_state:
         st.session_state.messages = []
 
@@ -195,12 +333,11 @@ with tab2:
         with st.chat_message("assistant"):
             with st.spinner("Memproses permintaan..."):
                 # Coba proses permintaan dengan fungsi lokal terlebih dahulu
-                response_text = process_gemini_request(prompt, coordinate_systems)
+                status, response_text = process_gemini_request(prompt)
                 
                 # Jika tidak berhasil diproses, kirim ke Gemini API
-                if "Maaf, saya tidak dapat menemukan" in response_text or "Format permintaan Anda salah" in response_text:
-                    gemini_response = model.generate_content(f"Tolong bantu konversi koordinat spasial. Formatnya: 'x, y dari [sistem_sumber] ke [sistem_target]'. Berikut permintaan pengguna: {prompt}")
-                    response_text = gemini_response.text
+                if status in ("unmatched", "bad_format"):
+                    response_text = _gemini_answer(_normalize_prompt(prompt), genai_api_key)
                 
                 st.markdown(response_text)
                 st.session_state.messages.append({"role": "assistant", "content": response_text})
\ No newline at end of file
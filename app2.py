@@ -1,49 +1,16 @@
 import streamlit as st
-import pandas as pd
-import pyproj
-import re
+
+from lib import dd_to_dms, dms_to_dd, get_transformer, coordinate_systems, formats
 
 # Set konfigurasi halaman Streamlit
 st.set_page_config(page_title="Konverter Koordinat Spasial Lengkap", layout="wide")
 
 # --- Bagian 1: Definisi Data dan Fungsi Bantuan ---
 
-# Fungsi untuk mengonversi DMS ke Derajat Desimal (DD)
-def dms_to_dd(dms_str):
-    """Mengonversi string DMS menjadi derajat desimal."""
-    try:
-        # Menggunakan regex untuk mengekstrak angka
-        parts = re.findall(r"[-+]?\d+\.?\d*", dms_str.replace(",", "."))
-        d = float(parts[0])
-        m = float(parts[1]) if len(parts) > 1 else 0
-        s = float(parts[2]) if len(parts) > 2 else 0
-
-        dd = abs(d) + m/60 + s/3600
-        
-        # Mengecek arah (N/S, E/W)
-        if re.search(r"[S|W]", dms_str, re.IGNORECASE):
-            dd *= -1
-        return dd
-    except (IndexError, ValueError):
-        return None
-
-# Fungsi untuk mengonversi Derajat Desimal (DD) ke DMS
-def dd_to_dms(dd_val, is_lon=False):
-    """Mengonversi derajat desimal menjadi string DMS."""
-    degrees = int(dd_val)
-    minutes_float = (abs(dd_val) - abs(degrees)) * 60
-    minutes = int(minutes_float)
-    seconds = (minutes_float - minutes) * 60
-    
-    if is_lon:
-        direction = 'E' if dd_val >= 0 else 'W'
-    else:
-        direction = 'N' if dd_val >= 0 else 'S'
-    
-    return f"{abs(degrees)}° {minutes}' {seconds:.2f}\" {direction}"
-
 # Fungsi utama untuk konversi
 def convert_coordinates(x_coord, y_coord, source_crs, target_crs, source_format, target_format):
+    import pyproj
+
     # Parsing input berdasarkan format sumber
     x_dd, y_dd = None, None
     if source_format == 'DD':
@@ -65,8 +32,11 @@ def convert_coordinates(x_coord, y_coord, source_crs, target_crs, source_format,
             return None, None
     
     try:
-        transformer = pyproj.Transformer.from_crs(source_crs, target_crs, always_xy=True)
-        x_converted, y_converted = transformer.transform(x_dd, y_dd)
+        # CRS sumber dan target sama: tidak perlu memanggil PROJ
+        if source_crs == target_crs:
+            x_converted, y_converted = x_dd, y_dd
+        else:
+            x_converted, y_converted = get_transformer(source_crs, target_crs).transform(x_dd, y_dd)
 
         # Mengembalikan output sesuai format target
         if target_format == 'DD':
@@ -82,21 +52,9 @@ def convert_coordinates(x_coord, y_coord, source_crs, target_crs, source_format,
         st.error(f"Error during conversion: {e}")
         return None, None
 
-# Daftar sistem dan format koordinat
-coordinate_systems = {
-    "Global": {
-        "WGS 84": "EPSG:4326",
-        "ITRF2014": "EPSG:7912",
-    },
-    "UTM (Indonesia)": {
-        "WGS 84 / UTM Zona 48N (Indonesia Barat)": "EPSG:32648",
-        "WGS 84 / UTM Zona 49N (Indonesia Tengah)": "EPSG:32649",
-        "WGS 84 / UTM Zona 50N (Indonesia Timur)": "EPSG:32650",
-        "WGS 84 / UTM Zona 48S": "EPSG:32748",
-    }
-}
-
-formats = ["DD", "DMS", "UTM"]
+# Daftar pilihan sidebar disiapkan sekali dan dipakai ulang oleh semua selectbox
+_CATEGORIES = tuple(coordinate_systems.keys())
+_NAMES_BY_CAT = {category: tuple(systems.keys()) for category, systems in coordinate_systems.items()}
 
 # --- Bagian 2: Antarmuka Streamlit ---
 st.title("🗺️ Konverter Koordinat Spasial Lengkap")
@@ -113,29 +71,32 @@ with st.sidebar:
     st.markdown("---")
     
     # Pilihan Sistem Koordinat Sumber
-    source_category = st.selectbox("Pilih Kategori Sumber:", list(coordinate_systems.keys()))
-    source_cs_name = st.selectbox("Pilih Sistem Koordinat Sumber:", list(coordinate_systems[source_category].keys()))
+    source_category = st.selectbox("Pilih Kategori Sumber:", _CATEGORIES)
+    source_cs_name = st.selectbox("Pilih Sistem Koordinat Sumber:", _NAMES_BY_CAT[source_category])
     source_crs = coordinate_systems[source_category][source_cs_name]
 
     # Pilihan Sistem Koordinat Target
-    target_category = st.selectbox("Pilih Kategori Target:", list(coordinate_systems.keys()))
-    target_cs_name = st.selectbox("Pilih Sistem Koordinat Target:", list(coordinate_systems[target_category].keys()))
+    target_category = st.selectbox("Pilih Kategori Target:", _CATEGORIES)
+    target_cs_name = st.selectbox("Pilih Sistem Koordinat Target:", _NAMES_BY_CAT[target_category])
     target_crs = coordinate_systems[target_category][target_cs_name]
 
 # Input dan Konversi
 st.subheader("Masukkan Koordinat Manual")
-col1, col2 = st.columns(2)
 
 # Mengatur label input berdasarkan format
 x_label = "Koordinat X (Longitude)" if source_format in ['DD', 'DMS'] else "Koordinat X (Easting)"
 y_label = "Koordinat Y (Latitude)" if source_format in ['DD', 'DMS'] else "Koordinat Y (Northing)"
 
-with col1:
-    x_input = st.text_input(f"Masukkan {x_label}:")
-with col2:
-    y_input = st.text_input(f"Masukkan {y_label}:")
+# Input dibungkus form agar skrip hanya dijalankan ulang saat tombol Konversi ditekan
+with st.form("manual_conv", clear_on_submit=False):
+    col1, col2 = st.columns(2)
+    with col1:
+        x_input = st.text_input(f"Masukkan {x_label}:")
+    with col2:
+        y_input = st.text_input(f"Masukkan {y_label}:")
+    submitted = st.form_submit_button("Konversi")
 
-if st.button("Konversi"):
+if submitted:
     if x_input and y_input:
         x_converted, y_converted = convert_coordinates(x_input, y_input, source_crs, target_crs, source_format, target_format)
         
@@ -1,84 +1,195 @@
 import streamlit as st
-import pyproj
 import re
 import json
+import math
 import os
-import google.generativeai as genai
-from datetime import datetime
+import queue
+import threading
+
+from lib import dms_to_dd, dms_series_to_dd, dd_to_dms, dd_array_to_dms, get_transformer, coordinate_systems, formats
 
 # --- Bagian 1: Inisialisasi Gemini API ---
+# Skema jawaban Gemini; mode JSON menjamin keluaran berupa objek JSON murni tanpa pagar markdown
+_EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "x_coord": {"type": "string"},
+        "y_coord": {"type": "string"},
+        "source_format": {"type": "string"},
+        "target_format": {"type": "string"},
+        "target_cs_name": {"type": "string"},
+    },
+    "required": ["x_coord", "y_coord", "source_format", "target_format"],
+}
+
+# Disimpan di cache agar konfigurasi dan model tidak dibuat ulang di setiap rerun Streamlit.
+# Kegagalan berupa exception sehingga tidak ikut tersimpan di cache.
+@st.cache_resource(show_spinner=False)
+def _get_gemini_model(api_key):
+    """Mengonfigurasi Gemini API dan membuat model chat untuk API key yang diberikan."""
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(
+        'gemini-1.5-flash',
+        generation_config={
+            "response_mime_type": "application/json",
+            "response_schema": _EXTRACTION_SCHEMA,
+            "temperature": 0,
+        },
+    )
+
 def initialize_gemini():
-    """Menginisialisasi Gemini API."""
+    """Menginisialisasi Gemini API dan model chat."""
+    # API key diperiksa di setiap rerun agar secret yang baru ditambahkan langsung terpakai
     try:
         if "gemini_api_key" in st.secrets:
-            genai.configure(api_key=st.secrets["gemini_api_key"])
-            return True
+            return _get_gemini_model(st.secrets["gemini_api_key"]), True
         else:
             st.error("Gemini API key not found. Please add 'gemini_api_key' to Streamlit secrets.")
-            return False
+            return None, False
     except Exception as e:
         st.error(f"Error initializing Gemini API: {e}")
+        return None, False
+
+# Hasil ekstraksi disimpan di cache agar prompt yang sama tidak memanggil Gemini berulang kali
+@st.cache_data(ttl=3600, max_entries=512, show_spinner=False)
+def _extract_conversion_request(prompt):
+    """Meminta Gemini mengekstrak parameter konversi dari prompt dan mengembalikannya sebagai dict."""
+    chat_model, _ = initialize_gemini()
+    response = chat_model.generate_content(
+        f"Identifikasi dan ekstrak koordinat, format asal (DD, DMS, atau UTM), dan format target (DD, DMS, atau UTM) dari teks berikut. Jika CRS target adalah UTM, sertakan zona (misalnya, 'UTM Zona 49N'). Jika suatu nilai tidak dapat diekstrak, isi dengan string kosong. Teks: '{prompt}'"
+    )
+    return json.loads(response.text)
+
+# Pola 'konversi X, Y ke TARGET' untuk koordinat DD atau DMS, diurai tanpa memanggil Gemini.
+# Target UTM wajib menyebut zona; tanpa zona permintaan diserahkan ke Gemini.
+_COORD_PATTERN = r"[-+]?\d+(?:\.\d+)?(?!\s*°)|\d+°.+?[NSEW]"
+_FAST_PARSE_RE = re.compile(
+    rf"konversi\s+(?P<x>{_COORD_PATTERN})\s*,\s*(?P<y>{_COORD_PATTERN})"
+    r"\s+ke\s+(?P<tgt>DD|DMS|UTM\s*(?:Zona\s*)?(?P<zone>\d+[NS]))\b",
+    re.IGNORECASE,
+)
+
+def _hemisphere(coord):
+    """Mengembalikan huruf arah (N/S/E/W) dari koordinat DMS, atau string kosong untuk DD."""
+    return coord[-1].upper() if "°" in coord else ""
+
+def _latitude_first(x_coord, y_coord):
+    """Menentukan apakah pasangan koordinat ditulis dengan lintang lebih dulu."""
+    if _hemisphere(x_coord) in ("N", "S") or _hemisphere(y_coord) in ("E", "W"):
+        return True
+    if "°" in x_coord or "°" in y_coord:
         return False
+    # Lintang selalu dalam ±90°, jadi nilai pertama ≤ 90 dan nilai kedua > 90 berarti lintang lebih dulu
+    return abs(float(x_coord)) <= 90 < abs(float(y_coord))
 
-gemini_initialized = initialize_gemini()
-chat_model = genai.GenerativeModel('gemini-1.5-flash')
+def _fast_parse_request(prompt):
+    """Mengurai permintaan berformat baku menjadi dict seperti hasil Gemini; None bila tidak cocok."""
+    match = _FAST_PARSE_RE.search(prompt)
+    if match is None:
+        return None
+    zone = match["zone"].upper() if match["zone"] else None
+    if zone is not None and zone not in UTM_ZONE_TO_EPSG:
+        return None
+    x_coord, y_coord = match["x"], match["y"]
+    # X selalu bujur dan Y lintang, apa pun urutan penulisannya
+    if _latitude_first(x_coord, y_coord):
+        x_coord, y_coord = y_coord, x_coord
+    target = match["tgt"].upper()
+    return {
+        "x_coord": x_coord,
+        "y_coord": y_coord,
+        "source_format": "DMS" if "°" in x_coord + y_coord else "DD",
+        "target_format": "UTM" if zone else target,
+        "target_cs_name": f"UTM {zone}" if zone else target,
+    }
 
 # --- Bagian 2: Fungsi untuk Database File-based ---
-HISTORY_FILE = "konversi_history.json"
+# Riwayat disimpan sebagai JSON Lines (satu pesan per baris) sehingga cukup ditambah di akhir file
+HISTORY_FILE = "konversi_history.jsonl"
+# File riwayat lama (satu array JSON) yang dikonversi sekali ke HISTORY_FILE
+LEGACY_HISTORY_FILE = "konversi_history.json"
+
+def _migrate_legacy_history():
+    """Mengonversi file riwayat JSON lama menjadi JSONL bila file JSONL belum ada."""
+    try:
+        with open(LEGACY_HISTORY_FILE, "r") as f:
+            history = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return
+    if not isinstance(history, list):
+        return
+    # Ditulis ke file sementara lalu diganti sekaligus agar pembaca tidak melihat file setengah jadi
+    tmp_file = HISTORY_FILE + ".tmp"
+    with open(tmp_file, "w") as f:
+        f.writelines(json.dumps(msg, separators=(",", ":")) + "\n" for msg in history)
+    os.replace(tmp_file, HISTORY_FILE)
 
 def load_history():
-    """Memuat riwayat konversi dari file JSON."""
+    """Memuat riwayat konversi dari file JSONL; baris yang rusak dilewati."""
+    history = []
+    if not os.path.exists(HISTORY_FILE) and os.path.exists(LEGACY_HISTORY_FILE):
+        _migrate_legacy_history()
     if os.path.exists(HISTORY_FILE):
-        try:
-            with open(HISTORY_FILE, "r") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return []
-    return []
+        with open(HISTORY_FILE, "r") as f:
+            for line in f:
+                try:
+                    history.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return history
 
-def save_history(history):
-    """Menyimpan riwayat konversi ke file JSON."""
-    with open(HISTORY_FILE, "w") as f:
-        json.dump(history, f, indent=4)
+def append_messages(messages):
+    """Menambahkan pesan ke akhir file riwayat JSONL."""
+    with open(HISTORY_FILE, "a") as f:
+        f.writelines(json.dumps(msg, separators=(",", ":")) + "\n" for msg in messages)
+
+# Penulisan file dilakukan oleh satu thread latar belakang agar chatbot tidak menunggu disk
+@st.cache_resource(show_spinner=False)
+def _get_history_writer():
+    """Menjalankan thread penulis riwayat dan mengembalikan antreannya."""
+    write_queue = queue.Queue()
+
+    def _writer():
+        while True:
+            messages = list(write_queue.get())
+            # Antrean yang menumpuk digabung menjadi satu kali tulis
+            while not write_queue.empty():
+                messages.extend(write_queue.get_nowait())
+            try:
+                append_messages(messages)
+            except OSError:
+                # Kegagalan menulis tidak boleh menghentikan thread penulis
+                continue
+
+    threading.Thread(target=_writer, daemon=True, name="history-writer").start()
+    return write_queue
+
+def queue_history(message):
+    """Menyerahkan satu pesan ke thread penulis riwayat."""
+    _get_history_writer().put([message])
 
 # --- Bagian 3: Definisi Data dan Fungsi Bantuan ---
-# Fungsi untuk mengonversi DMS ke Derajat Desimal (DD)
-def dms_to_dd(dms_str):
-    """Mengonversi string DMS menjadi derajat desimal."""
-    try:
-        parts = re.findall(r"[-+]?\d+\.?\d*", dms_str.replace(",", "."))
-        d = float(parts[0])
-        m = float(parts[1]) if len(parts) > 1 else 0
-        s = float(parts[2]) if len(parts) > 2 else 0
-
-        dd = abs(d) + m/60 + s/3600
-        
-        if re.search(r"[S|W]", dms_str, re.IGNORECASE):
-            dd *= -1
-        return dd
-    except (IndexError, ValueError):
-        return None
+# Registri Transformer untuk semua pasangan CRS di coordinate_systems, dibangun sekali per proses
+@st.cache_resource(show_spinner="Menyiapkan sistem koordinat...")
+def build_transformers():
+    """Membangun Transformer untuk setiap pasangan kode EPSG yang tersedia di sidebar."""
+    all_epsg = [code for systems in coordinate_systems.values() for code in systems.values()]
+    return {(a, b): get_transformer(a, b) for a in all_epsg for b in all_epsg if a != b}
 
-# Fungsi untuk mengonversi Derajat Desimal (DD) ke DMS
-def dd_to_dms(dd_val, is_lon=False):
-    """Mengonversi derajat desimal menjadi string DMS."""
-    if dd_val is None:
-        return None
-    degrees = int(dd_val)
-    minutes_float = (abs(dd_val) - abs(degrees)) * 60
-    minutes = int(minutes_float)
-    seconds = (minutes_float - minutes) * 60
-    
-    if is_lon:
-        direction = 'E' if dd_val >= 0 else 'W'
-    else:
-        direction = 'N' if dd_val >= 0 else 'S'
-    
-    return f"{abs(degrees)}° {minutes}' {seconds:.2f}\" {direction}"
+def _transformer_for(source_crs, target_crs):
+    """Mengambil Transformer dari registri, atau membuatnya bila pasangan CRS tidak terdaftar."""
+    transformer = build_transformers().get((source_crs, target_crs))
+    if transformer is None:
+        transformer = get_transformer(source_crs, target_crs)
+    return transformer
 
 # Fungsi utama untuk konversi
 def convert_coordinates(x_coord, y_coord, source_crs, target_crs, source_format):
     """Mengonversi koordinat dari satu CRS dan format ke yang lain."""
+    import pyproj
+
     x_dd, y_dd = None, None
     if source_format == 'DD':
         try:
@@ -97,71 +208,107 @@ def convert_coordinates(x_coord, y_coord, source_crs, target_crs, source_format)
             y_dd = float(y_coord)
         except ValueError:
             return None, None
+
+    # CRS sumber dan target sama: tidak perlu memanggil PROJ
+    if source_crs == target_crs:
+        return x_dd, y_dd
     
     try:
-        transformer = pyproj.Transformer.from_crs(source_crs, target_crs, always_xy=True)
-        x_converted, y_converted = transformer.transform(x_dd, y_dd)
+        x_converted, y_converted = _transformer_for(source_crs, target_crs).transform(x_dd, y_dd)
+        # PROJ mengembalikan inf untuk titik di luar jangkauan proyeksi; anggap gagal
+        if not (math.isfinite(x_converted) and math.isfinite(y_converted)):
+            return None, None
         return x_converted, y_converted
     except pyproj.exceptions.CRSError:
         return None, None
     except Exception:
         return None, None
 
-# Daftar sistem dan format koordinat
-coordinate_systems = {
-    "Global": {
-        "WGS 84": "EPSG:4326",
-        "ITRF2014": "EPSG:7912",
-    },
-    "UTM (Indonesia)": {
-        "WGS 84 / UTM Zona 48N (Indonesia Barat)": "EPSG:32648",
-        "WGS 84 / UTM Zona 49N (Indonesia Tengah)": "EPSG:32649",
-        "WGS 84 / UTM Zona 50N (Indonesia Timur)": "EPSG:32650",
-        "WGS 84 / UTM Zona 48S": "EPSG:32748",
-    }
+# Fungsi konversi untuk banyak titik sekaligus
+def convert_coordinates_array(xs, ys, source_crs, target_crs, source_format):
+    """Mengonversi array koordinat dalam satu panggilan PROJ; titik gagal diisi NaN dan ditandai lewat mask."""
+    import numpy as np
+    import pandas as pd
+
+    if source_format == 'DMS':
+        xs = dms_series_to_dd(pd.Series(xs)).to_numpy(dtype=np.float64, copy=True)
+        ys = dms_series_to_dd(pd.Series(ys)).to_numpy(dtype=np.float64, copy=True)
+    else:
+        # Sel yang bukan angka menjadi NaN dan dilaporkan sebagai baris gagal
+        xs = pd.to_numeric(pd.Series(xs), errors='coerce').to_numpy(dtype=np.float64, copy=True)
+        ys = pd.to_numeric(pd.Series(ys), errors='coerce').to_numpy(dtype=np.float64, copy=True)
+
+    if source_crs != target_crs:
+        xs, ys = _transformer_for(source_crs, target_crs).transform(xs, ys)
+    # PROJ mengembalikan inf untuk titik yang tidak dapat dikonversi; diisi NaN agar kosong di CSV
+    valid = np.isfinite(xs) & np.isfinite(ys)
+    xs[~valid] = np.nan
+    ys[~valid] = np.nan
+    return xs, ys, valid
+
+# Jumlah indeks baris gagal yang ditampilkan di peringatan tab CSV
+FAILED_ROW_EXAMPLES = 10
+
+# Zona UTM yang dikenali chatbot; menambah zona cukup satu baris di sini
+UTM_ZONE_TO_EPSG = {
+    "48N": "EPSG:32648",
+    "49N": "EPSG:32649",
+    "50N": "EPSG:32650",
+    "48S": "EPSG:32748",
 }
+_ZONE_RE = re.compile(r"(?<!\d)(4[89][NS]|50[NS])\b")
 
-formats = ["DD", "DMS", "UTM"]
+# Daftar pilihan sidebar disiapkan sekali dan dipakai ulang oleh semua selectbox
+_CATEGORIES = tuple(coordinate_systems.keys())
+_NAMES_BY_CAT = {category: tuple(systems.keys()) for category, systems in coordinate_systems.items()}
 
 # --- Bagian 4: Antarmuka Streamlit ---
 st.set_page_config(page_title="Konverter Koordinat Spasial Lengkap", layout="wide")
+
+# Biaya pembuatan Transformer dibayar saat aplikasi dimuat, bukan saat tombol diklik;
+# dipanggil setelah set_page_config karena spinner-nya sudah merupakan perintah Streamlit
+build_transformers()
+
 st.title("🗺️ Konverter Koordinat Spasial Lengkap")
 
-# Pilihan tabs
-tab1, tab2 = st.tabs(["Konversi Manual", "Chatbot Konversi"])
+# Pengaturan konversi di sidebar dipakai bersama oleh tab manual dan tab CSV
+with st.sidebar:
+    st.header("Pengaturan Konversi Manual")
 
-# --- Tab 1: Konversi Manual ---
-with tab1:
-    st.write("Konversi leluasa antara format koordinat yang berbeda.")
+    source_format = st.selectbox("Pilih Format Koordinat Sumber:", formats, key="manual_source_format")
+    target_format = st.selectbox("Pilih Format Koordinat Target:", formats, key="manual_target_format")
+
+    st.markdown("---")
 
-    with st.sidebar:
-        st.header("Pengaturan Konversi Manual")
-        
-        source_format = st.selectbox("Pilih Format Koordinat Sumber:", formats, key="manual_source_format")
-        target_format = st.selectbox("Pilih Format Koordinat Target:", formats, key="manual_target_format")
-        
-        st.markdown("---")
-        
-        source_category = st.selectbox("Pilih Kategori Sumber:", list(coordinate_systems.keys()), key="manual_source_cat")
-        source_cs_name = st.selectbox("Pilih Sistem Koordinat Sumber:", list(coordinate_systems[source_category].keys()), key="manual_source_cs")
-        source_crs = coordinate_systems[source_category][source_cs_name]
-
-        target_category = st.selectbox("Pilih Kategori Target:", list(coordinate_systems.keys()), key="manual_target_cat")
-        target_cs_name = st.selectbox("Pilih Sistem Koordinat Target:", list(coordinate_systems[target_category].keys()), key="manual_target_cs")
-        target_crs = coordinate_systems[target_category][target_cs_name]
+    source_category = st.selectbox("Pilih Kategori Sumber:", _CATEGORIES, key="manual_source_cat")
+    source_cs_name = st.selectbox("Pilih Sistem Koordinat Sumber:", _NAMES_BY_CAT[source_category], key="manual_source_cs")
+    source_crs = coordinate_systems[source_category][source_cs_name]
+
+    target_category = st.selectbox("Pilih Kategori Target:", _CATEGORIES, key="manual_target_cat")
+    target_cs_name = st.selectbox("Pilih Sistem Koordinat Target:", _NAMES_BY_CAT[target_category], key="manual_target_cs")
+    target_crs = coordinate_systems[target_category][target_cs_name]
+
+# Fragment: interaksi form hanya menjalankan ulang isi tab ini, bukan seluruh skrip
+@st.fragment
+def _render_manual_tab(source_format, target_format, source_crs, target_crs, source_cs_name, target_cs_name):
+    """Menampilkan form konversi manual beserta hasilnya."""
+    st.write("Konversi leluasa antara format koordinat yang berbeda.")
 
     st.subheader("Masukkan Koordinat Manual")
-    col1, col2 = st.columns(2)
 
     x_label = "Koordinat X (Longitude)" if source_format in ['DD', 'DMS'] else "Koordinat X (Easting)"
     y_label = "Koordinat Y (Latitude)" if source_format in ['DD', 'DMS'] else "Koordinat Y (Northing)"
 
-    with col1:
-        x_input = st.text_input(f"Masukkan {x_label}:", key="manual_x")
-    with col2:
-        y_input = st.text_input(f"Masukkan {y_label}:", key="manual_y")
+    # Input dibungkus form agar skrip hanya dijalankan ulang saat tombol Konversi ditekan
+    with st.form("manual_conv", clear_on_submit=False):
+        col1, col2 = st.columns(2)
+        with col1:
+            x_input = st.text_input(f"Masukkan {x_label}:", key="manual_x")
+        with col2:
+            y_input = st.text_input(f"Masukkan {y_label}:", key="manual_y")
+        submitted = st.form_submit_button("Konversi")
 
-    if st.button("Konversi", key="manual_button"):
+    if submitted:
         if x_input and y_input:
             x_converted, y_converted = convert_coordinates(x_input, y_input, source_crs, target_crs, source_format)
             
@@ -179,8 +326,10 @@ with tab1:
             else:
                 st.error("Terjadi kesalahan. Mohon periksa format input Anda. Contoh format DMS: 6° 55' 38.87\" S")
 
-# --- Tab 2: Chatbot Konversi ---
-with tab2:
+# Fragment: mengetik dan mengirim pesan chat hanya menjalankan ulang isi tab ini
+@st.fragment
+def _render_chatbot_tab():
+    """Menampilkan riwayat chat dan memproses permintaan konversi baru."""
     st.header("Chatbot Konversi Koordinat")
     st.write("Silakan ketik permintaan konversi Anda. Contoh: 'konversi -6.9248, 107.6186 ke UTM' atau 'konversi 6° 55' 38.87\" S, 107° 38' 11.23\" E ke UTM 49N'.")
 
@@ -193,19 +342,21 @@ with tab2:
 
     if prompt := st.chat_input("Apa yang ingin Anda konversi?"):
         st.session_state.messages.append({"role": "user", "content": prompt})
+        queue_history(st.session_state.messages[-1])
         with st.chat_message("user"):
             st.markdown(prompt)
 
         with st.chat_message("assistant"):
             with st.spinner("Memproses..."):
+                # Permintaan berformat baku diurai secara lokal; Gemini hanya dipanggil bila gagal
+                data = _fast_parse_request(prompt)
+                gemini_initialized = data is not None or initialize_gemini()[1]
                 if not gemini_initialized:
                     st.warning("Gemini API tidak dapat diinisialisasi. Fitur chatbot tidak aktif.")
                 else:
                     try:
-                        response = chat_model.generate_content(
-                            f"Identifikasi dan ekstrak koordinat, format asal (DD, DMS, atau UTM), dan format target (DD, DMS, atau UTM) dari teks berikut. Balas dalam format JSON. Jika CRS target adalah UTM, sertakan zona (misalnya, 'UTM Zona 49N'). Jika tidak dapat diekstrak, beri tahu saya. Teks: '{prompt}'"
-                        )
-                        data = json.loads(response.text.replace('```json\n', '').replace('\n```', ''))
+                        if data is None:
+                            data = _extract_conversion_request(prompt)
 
                         x_input = data.get('x_coord')
                         y_input = data.get('y_coord')
@@ -215,13 +366,9 @@ with tab2:
 
                         if x_input and y_input and source_format and target_format:
                             source_crs = "EPSG:4326"
-                            target_crs = "EPSG:4326"
-                            if "UTM" in target_cs_name:
-                                if "48N" in target_cs_name: target_crs = "EPSG:32648"
-                                elif "49N" in target_cs_name: target_crs = "EPSG:32649"
-                                elif "50N" in target_cs_name: target_crs = "EPSG:32650"
-                                elif "48S" in target_cs_name: target_crs = "EPSG:32748"
-                            
+                            zone_match = _ZONE_RE.search(target_cs_name or "")
+                            target_crs = UTM_ZONE_TO_EPSG.get(zone_match.group(1), "EPSG:4326") if zone_match else "EPSG:4326"
+
                             x_converted, y_converted = convert_coordinates(x_input, y_input, source_crs, target_crs, source_format)
 
                             if x_converted is not None:
@@ -232,17 +379,69 @@ with tab2:
                                 response_text = f"Tentu, koordinat hasil konversi Anda adalah: `{x_out}, {y_out}`."
                                 st.markdown(response_text)
                                 st.session_state.messages.append({"role": "assistant", "content": response_text})
-                                save_history(st.session_state.messages)
+                                queue_history(st.session_state.messages[-1])
                                 st.toast("✅ Konversi disimpan ke riwayat!")
                             else:
                                 response_text = "Maaf, saya tidak dapat melakukan konversi dengan format tersebut. Bisakah Anda coba lagi?"
                                 st.markdown(response_text)
                                 st.session_state.messages.append({"role": "assistant", "content": response_text})
+                                queue_history(st.session_state.messages[-1])
                         else:
                             response_text = "Maaf, saya tidak memahami permintaan Anda. Mohon gunakan format seperti 'konversi [koordinat X], [koordinat Y] ke [CRS target]'."
                             st.markdown(response_text)
                             st.session_state.messages.append({"role": "assistant", "content": response_text})
+                            queue_history(st.session_state.messages[-1])
                     except Exception as e:
                         response_text = f"Terjadi kesalahan saat memproses permintaan: {e}. Mohon coba lagi."
                         st.markdown(response_text)
                         st.session_state.messages.append({"role": "assistant", "content": response_text})
+                        queue_history(st.session_state.messages[-1])
+
+# Pilihan tabs
+tab1, tab2, tab3 = st.tabs(["Konversi Manual", "Konversi CSV", "Chatbot Konversi"])
+
+# --- Tab 1: Konversi Manual ---
+with tab1:
+    _render_manual_tab(source_format, target_format, source_crs, target_crs, source_cs_name, target_cs_name)
+
+# --- Tab 2: Konversi CSV ---
+with tab2:
+    st.write("Unggah file CSV dengan kolom **'x'** dan **'y'**. Pengaturan konversi diambil dari sidebar.")
+    uploaded_file = st.file_uploader("Pilih file CSV", type="csv", key="batch_csv")
+    if uploaded_file is not None:
+        import numpy as np
+        import pandas as pd
+
+        try:
+            df = pd.read_csv(uploaded_file)
+            if 'x' in df.columns and 'y' in df.columns:
+                x_converted, y_converted, valid = convert_coordinates_array(df['x'], df['y'], source_crs, target_crs, source_format)
+                if target_format == 'DMS':
+                    x_converted, y_converted = dd_array_to_dms(x_converted, is_lon=True), dd_array_to_dms(y_converted)
+                df['x_converted'], df['y_converted'] = x_converted, y_converted
+
+                failed_index = np.flatnonzero(~valid)
+                if len(failed_index):
+                    more = " ..." if len(failed_index) > FAILED_ROW_EXAMPLES else ""
+                    st.warning(
+                        f"{len(failed_index)} baris gagal dikonversi (lihat indeks: {failed_index[:FAILED_ROW_EXAMPLES].tolist()}{more}). "
+                        "Mohon periksa kembali nilai koordinatnya."
+                    )
+                else:
+                    st.success("✅ Konversi Berhasil!")
+                st.dataframe(df)
+                st.download_button(
+                    label="📥 Unduh Hasil Konversi (CSV)",
+                    data=df.to_csv(index=False).encode('utf-8'),
+                    file_name='converted_coordinates.csv',
+                    mime='text/csv',
+                    key="batch_download",
+                )
+            else:
+                st.error("File CSV harus memiliki kolom **'x'** dan **'y'**.")
+        except Exception as e:
+            st.error(f"Terjadi kesalahan saat memproses file: {e}")
+
+# --- Tab 3: Chatbot Konversi ---
+with tab3:
+    _render_chatbot_tab()
@@ -0,0 +1,117 @@
+import streamlit as st
+import re
+
+# Fungsi bantuan dan data koordinat yang dipakai bersama oleh app2.py dan app3.py
+
+# Pola regex untuk parsing DMS dikompilasi sekali saat modul dimuat
+_DMS_RE = re.compile(r"([-+]?\d+\.?\d*)")
+_HEMI_RE = re.compile(r"[SW]", re.IGNORECASE)
+# Pola lengkap untuk dms_to_dd: derajat, menit, detik, dan arah (S/W di depan atau belakang) dalam satu pencocokan
+_DMS_FULL_RE = re.compile(
+    r"(?:[^\d+-]*?(?P<hemi_pre>[SW]))?[^\d+-]*"
+    r"(?P<d>[-+]?\d+\.?\d*)"
+    r"(?:[^\d+-]+(?P<m>\d+\.?\d*))?"
+    r"(?:[^\d+-]+(?P<s>\d+\.?\d*))?"
+    r"(?:[^SW]*(?P<hemi>[SW]))?",
+    re.IGNORECASE,
+)
+
+# Fungsi untuk mengonversi DMS ke Derajat Desimal (DD)
+def dms_to_dd(dms_str):
+    """Mengonversi string DMS menjadi derajat desimal."""
+    match = _DMS_FULL_RE.match(dms_str.replace(",", "."))
+    if match is None:
+        return None
+    dd = abs(float(match["d"]))
+    if match["m"]:
+        dd += float(match["m"])/60
+    if match["s"]:
+        dd += float(match["s"])/3600
+
+    # Mengecek arah (N/S, E/W)
+    if match["hemi_pre"] or match["hemi"]:
+        dd *= -1
+    return dd
+
+# Fungsi untuk mengonversi satu kolom DMS ke Derajat Desimal (DD) sekaligus
+def dms_series_to_dd(dms_series):
+    """Mengonversi Series string DMS menjadi Series derajat desimal secara tervektorisasi."""
+    import numpy as np
+    import pandas as pd
+
+    s = dms_series.astype(str).reset_index(drop=True)
+    parts = (
+        s.str.replace(",", ".", regex=False)
+        .str.extractall(_DMS_RE)[0]
+        .astype(float)
+        .unstack()
+        .reindex(index=s.index, columns=range(3))
+        .to_numpy()
+    )
+    d, m, sec = parts[:, 0], np.nan_to_num(parts[:, 1]), np.nan_to_num(parts[:, 2])
+    dd = np.abs(d) + m/60 + sec/3600
+    dd *= np.where(s.str.contains(_HEMI_RE), -1.0, 1.0)
+    return pd.Series(dd, index=dms_series.index)
+
+# Fungsi untuk mengonversi Derajat Desimal (DD) ke DMS
+def dd_to_dms(dd_val, is_lon=False):
+    """Mengonversi derajat desimal menjadi string DMS."""
+    if dd_val is None:
+        return None
+    negative = dd_val < 0
+    degrees, rem = divmod(abs(dd_val) * 3600.0, 3600.0)
+    minutes, seconds = divmod(rem, 60.0)
+
+    if is_lon:
+        direction = 'W' if negative else 'E'
+    else:
+        direction = 'S' if negative else 'N'
+
+    return f"{int(degrees)}° {int(minutes)}' {seconds:.2f}\" {direction}"
+
+# Fungsi untuk mengonversi array Derajat Desimal (DD) ke DMS sekaligus
+def dd_array_to_dms(dd_values, is_lon=False):
+    """Mengonversi array derajat desimal menjadi array string DMS secara tervektorisasi."""
+    import numpy as np
+
+    dd = np.asarray(dd_values, dtype='float64')
+    valid = np.isfinite(dd)
+    abs_dd = np.abs(np.where(valid, dd, 0.0))
+    # Dekomposisi sama dengan dd_to_dms agar hasil tab manual dan CSV identik
+    degrees, rem = np.divmod(abs_dd * 3600.0, 3600.0)
+    minutes, seconds = np.divmod(rem, 60.0)
+
+    negative = dd < 0
+    if is_lon:
+        direction = np.where(negative, 'W', 'E')
+    else:
+        direction = np.where(negative, 'S', 'N')
+
+    dms = np.char.add(
+        np.char.add(np.char.mod("%d° ", degrees), np.char.mod("%d' ", minutes)),
+        np.char.add(np.char.mod('%.2f" ', seconds), direction),
+    )
+    return np.where(valid, dms, None)
+
+# Transformer disimpan di cache agar tidak dibuat ulang di setiap konversi maupun rerun Streamlit
+@st.cache_resource(show_spinner=False)
+def get_transformer(source_crs, target_crs):
+    """Mengembalikan pyproj.Transformer untuk pasangan CRS yang diberikan."""
+    import pyproj
+    return pyproj.Transformer.from_crs(source_crs, target_crs, always_xy=True)
+
+# Daftar sistem dan format koordinat
+coordinate_systems = {
+    "Global": {
+        "WGS 84": "EPSG:4326",
+        "ITRF2014": "EPSG:7912",
+    },
+    "UTM (Indonesia)": {
+        "WGS 84 / UTM Zona 48N (Indonesia Barat)": "EPSG:32648",
+        "WGS 84 / UTM Zona 49N (Indonesia Tengah)": "EPSG:32649",
+        "WGS 84 / UTM Zona 50N (Indonesia Timur)": "EPSG:32650",
+        "WGS 84 / UTM Zona 48S": "EPSG:32748",
+    }
+}
+
+formats = ["DD", "DMS", "UTM"]